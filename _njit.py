@@ -0,0 +1,215 @@
+"""
+Numba-compiled kernels for the tight scalar recurrences (Wilder smoothing)
+that pandas cannot vectorize. Numba is optional: if it is not installed the
+kernels run as plain Python/NumPy, just slower.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Fallback: a no-op decorator so the kernels still work without numba
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+
+@njit(cache=True)
+def wilder_smooth(x: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's smoothing (RMA) of a float64 array in a single pass.
+
+    Seeds with the simple mean of the first `period` valid values, then
+    applies the recurrence out[i] = out[i-1] + (x[i] - out[i-1]) / period.
+    Leading NaNs (e.g. the warm-up of an upstream indicator) are skipped
+    and the warm-up region stays NaN.
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+
+    # Skip leading NaNs so smoothing a DX/gain/loss series with a warm-up works
+    start = 0
+    while start < n and np.isnan(x[start]):
+        start += 1
+    if start + period > n:
+        return out
+
+    acc = 0.0
+    for i in range(start, start + period):
+        acc += x[i]
+    out[start + period - 1] = acc / period
+
+    alpha = 1.0 / period
+    for i in range(start + period, n):
+        out[i] = out[i - 1] + alpha * (x[i] - out[i - 1])
+    return out
+
+
+@njit(cache=True)
+def compute_all(o, h, l, c, rsi_p, macd_fast, macd_slow, macd_sig,
+                atr_p, adx_p, bb_p, bb_std):
+    """
+    Fused indicator kernel: one pass over the OHLC arrays computes RSI
+    (Wilder), MACD line/signal/histogram, ATR (Wilder), Bollinger Bands,
+    ADX and the candlestick pattern flags, instead of each indicator
+    re-traversing the same data.
+
+    All smoothing state (EMAs, Wilder averages, DX seed) is carried as
+    scalars updated per bar; outputs are written into preallocated arrays.
+    Warm-up bars are NaN (pattern flags are 0).
+    """
+    n = c.shape[0]
+    rsi = np.full(n, np.nan)
+    macd = np.full(n, np.nan)
+    macd_signal = np.full(n, np.nan)
+    hist = np.full(n, np.nan)
+    atr = np.full(n, np.nan)
+    adx = np.full(n, np.nan)
+    bb_up = np.full(n, np.nan)
+    bb_mid = np.full(n, np.nan)
+    bb_lo = np.full(n, np.nan)
+    bull = np.zeros(n, dtype=np.int8)
+    hammer = np.zeros(n, dtype=np.int8)
+
+    alpha_fast = 2.0 / (macd_fast + 1.0)
+    alpha_slow = 2.0 / (macd_slow + 1.0)
+    alpha_sig = 2.0 / (macd_sig + 1.0)
+
+    ema_fast = 0.0
+    ema_slow = 0.0
+    sig_ema = 0.0
+    gain_acc = 0.0
+    loss_acc = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    tr_acc = 0.0
+    atr_val = 0.0
+    trs_acc = 0.0
+    pdm_acc = 0.0
+    mdm_acc = 0.0
+    tr_rma = 0.0
+    pdm_rma = 0.0
+    mdm_rma = 0.0
+    dx_acc = 0.0
+    dx_cnt = 0
+    adx_val = 0.0
+
+    for i in range(n):
+        ci = c[i]
+
+        # MACD: two price EMAs plus the signal EMA, seeded on the first bar
+        if i == 0:
+            ema_fast = ci
+            ema_slow = ci
+        else:
+            ema_fast += alpha_fast * (ci - ema_fast)
+            ema_slow += alpha_slow * (ci - ema_slow)
+        m = ema_fast - ema_slow
+        if i == 0:
+            sig_ema = m
+        else:
+            sig_ema += alpha_sig * (m - sig_ema)
+        macd[i] = m
+        macd_signal[i] = sig_ema
+        hist[i] = m - sig_ema
+
+        # True Range and directional movement (bar 0 has no previous bar)
+        if i == 0:
+            tr = h[0] - l[0]
+            pdm = 0.0
+            mdm = 0.0
+        else:
+            tr = max(max(h[i] - l[i], abs(h[i] - c[i - 1])), abs(l[i] - c[i - 1]))
+            up = h[i] - h[i - 1]
+            dn = l[i] - l[i - 1]
+            pdm = up if (up > dn and up > 0.0) else 0.0
+            mdm = dn if (dn > up and dn > 0.0) else 0.0
+
+        # ATR: Wilder smoothing of TR
+        if i < atr_p - 1:
+            tr_acc += tr
+        elif i == atr_p - 1:
+            tr_acc += tr
+            atr_val = tr_acc / atr_p
+            atr[i] = atr_val
+        else:
+            atr_val += (tr - atr_val) / atr_p
+            atr[i] = atr_val
+
+        # ADX: Wilder-smoothed TR/+DM/-DM, then Wilder-smoothed DX
+        if i < adx_p - 1:
+            trs_acc += tr
+            pdm_acc += pdm
+            mdm_acc += mdm
+        elif i == adx_p - 1:
+            trs_acc += tr
+            pdm_acc += pdm
+            mdm_acc += mdm
+            tr_rma = trs_acc / adx_p
+            pdm_rma = pdm_acc / adx_p
+            mdm_rma = mdm_acc / adx_p
+        else:
+            tr_rma += (tr - tr_rma) / adx_p
+            pdm_rma += (pdm - pdm_rma) / adx_p
+            mdm_rma += (mdm - mdm_rma) / adx_p
+        if i >= adx_p - 1:
+            pdi = 100.0 * pdm_rma / tr_rma if tr_rma > 0.0 else 0.0
+            mdi = 100.0 * mdm_rma / tr_rma if tr_rma > 0.0 else 0.0
+            di_sum = pdi + mdi
+            dx = abs(pdi - mdi) / di_sum * 100.0 if di_sum > 0.0 else 0.0
+            if dx_cnt < adx_p:
+                dx_acc += dx
+                dx_cnt += 1
+                if dx_cnt == adx_p:
+                    adx_val = dx_acc / adx_p
+                    adx[i] = adx_val
+            else:
+                adx_val += (dx - adx_val) / adx_p
+                adx[i] = adx_val
+
+        # RSI: Wilder-smoothed average gain/loss
+        if i > 0:
+            delta = ci - c[i - 1]
+            g = delta if delta > 0.0 else 0.0
+            lo = -delta if delta < 0.0 else 0.0
+            if i <= rsi_p:
+                gain_acc += g
+                loss_acc += lo
+                if i == rsi_p:
+                    avg_gain = gain_acc / rsi_p
+                    avg_loss = loss_acc / rsi_p
+            else:
+                avg_gain += (g - avg_gain) / rsi_p
+                avg_loss += (lo - avg_loss) / rsi_p
+            if i >= rsi_p:
+                rs = avg_gain / (avg_loss if avg_loss > 0.0 else 1e-10)
+                rsi[i] = 100.0 - 100.0 / (1.0 + rs)
+
+        # Bollinger Bands: SMA and sample std over the last bb_p closes
+        if i >= bb_p - 1:
+            acc = 0.0
+            for j in range(i - bb_p + 1, i + 1):
+                acc += c[j]
+            mean = acc / bb_p
+            var = 0.0
+            for j in range(i - bb_p + 1, i + 1):
+                d = c[j] - mean
+                var += d * d
+            std = (var / (bb_p - 1)) ** 0.5
+            bb_mid[i] = mean
+            bb_up[i] = mean + bb_std * std
+            bb_lo[i] = mean - bb_std * std
+
+        # Candlestick patterns (same rules as detect_candlestick_patterns)
+        if i > 0:
+            body = abs(ci - o[i])
+            if (c[i - 1] < o[i - 1]) and (ci > o[i]) and (ci > o[i - 1]) and (o[i] < c[i - 1]):
+                bull[i] = 1
+            if body <= 0.3 * (h[i] - l[i]) and (min(ci, o[i]) - l[i]) >= 2.0 * body:
+                hammer[i] = 1
+
+    return rsi, macd, macd_signal, hist, atr, bb_up, bb_mid, bb_lo, adx, bull, hammer
@@ -2,19 +2,23 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Determine the directory where config.py resides
-env_path = Path(__file__).parent / ".env"
-load_dotenv(dotenv_path=env_path)
+# Determine the directory where config.py resides.
+# Only parse the .env file when the variables aren't already in the
+# environment: dotenv re-reads the file on every call, and config is
+# imported by several modules.
+if not os.getenv("OANDA_API_KEY"):
+    env_path = Path(__file__).parent / ".env"
+    load_dotenv(dotenv_path=env_path)
 
 # Retrieve environment variables
 OANDA_API_KEY = os.getenv("OANDA_API_KEY")
 OANDA_ACCOUNT_ID = os.getenv("OANDA_ACCOUNT_ID")
 OANDA_ENV = os.getenv("OANDA_ENV")
 
-# For debugging, log these values (masking sensitive parts)
-print("DEBUG: Loaded OANDA_API_KEY:", OANDA_API_KEY)
-print("DEBUG: Loaded OANDA_ACCOUNT_ID:", OANDA_ACCOUNT_ID)
-print("DEBUG: Loaded OANDA_ENV:", OANDA_ENV)
+# Opt-in debugging only; credentials should not hit stdout/logs by default
+if os.getenv("OANDA_DEBUG"):
+    print("DEBUG: Loaded OANDA_ACCOUNT_ID:", OANDA_ACCOUNT_ID)
+    print("DEBUG: Loaded OANDA_ENV:", OANDA_ENV)
 
 # =====================================
 # OANDA API Settings
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import datetime
 from dateutil.parser import isoparse
 from oandapyV20 import API
@@ -37,7 +38,15 @@ def fetch_data_for_period(
     # Use the provided granularity in the request
     price_type = "M"  # mid prices
     
-    all_candles = []
+    # Accumulate one NumPy array per column per chunk and build a single
+    # DataFrame at the end, instead of a per-chunk list-of-dicts -> DataFrame
+    # -> concat pipeline that doubles peak memory on large pulls.
+    # Timestamps stay raw strings until one batched pd.to_datetime at the end.
+    all_times = []
+    all_opens = []
+    all_highs = []
+    all_lows = []
+    all_closes = []
     current_start = start_dt
 
     while True:
@@ -65,22 +74,16 @@ def fetch_data_for_period(
         if not candles:
             break
 
-        # Convert candles to DataFrame rows
-        chunk_df = pd.DataFrame([
-            {
-                "time": c["time"],
-                "open": float(c["mid"]["o"]),
-                "high": float(c["mid"]["h"]),
-                "low": float(c["mid"]["l"]),
-                "close": float(c["mid"]["c"])
-            }
-            for c in candles if c.get("complete", False)
-        ])
-
-        if not chunk_df.empty:
-            chunk_df["time"] = pd.to_datetime(chunk_df["time"])
-            chunk_df.set_index("time", inplace=True)
-            all_candles.append(chunk_df)
+        # Convert candles to per-column arrays (complete candles only).
+        # NumPy parses the price strings straight to float64, so no Python
+        # float() call and no object-dtype intermediate per candle.
+        complete = [c for c in candles if c.get("complete", False)]
+        if complete:
+            all_times.extend(c["time"] for c in complete)
+            all_opens.append(np.array([c["mid"]["o"] for c in complete], dtype=np.float64))
+            all_highs.append(np.array([c["mid"]["h"] for c in complete], dtype=np.float64))
+            all_lows.append(np.array([c["mid"]["l"] for c in complete], dtype=np.float64))
+            all_closes.append(np.array([c["mid"]["c"] for c in complete], dtype=np.float64))
 
         if chunk_end >= end_dt:
             break
@@ -88,8 +91,16 @@ def fetch_data_for_period(
             # Continue from chunk_end, adding a small offset to avoid overlap
             current_start = chunk_end + datetime.timedelta(seconds=1)
 
-    if all_candles:
-        final_df = pd.concat(all_candles)
+    if all_times:
+        final_df = pd.DataFrame(
+            {
+                "open": np.concatenate(all_opens),
+                "high": np.concatenate(all_highs),
+                "low": np.concatenate(all_lows),
+                "close": np.concatenate(all_closes),
+            },
+            index=pd.to_datetime(all_times, utc=True).rename("time"),
+        )
         final_df = final_df[~final_df.index.duplicated(keep="first")]
         final_df.sort_index(inplace=True)
         return final_df
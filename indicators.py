@@ -5,18 +5,26 @@ Indicator calculations (RSI, MACD, ATR, etc.) for use in both live trading and b
 import pandas as pd
 import numpy as np
 
+from _njit import wilder_smooth, compute_all
+
 def compute_rsi(data: pd.DataFrame, period: int) -> pd.Series:
     """
     Calculate RSI on 'close' prices over a specified period.
+    Uses Wilder's smoothing (RMA) for the average gain/loss, matching the
+    standard TradingView/ta-lib definition, via the single-pass kernel.
     """
-    delta = data["close"].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss.replace(0, 1e-10)  # prevent division by zero
+    close = data["close"].to_numpy(dtype=np.float64)
+    delta = np.empty_like(close)
+    # NaN first delta (as .diff() produced), so the Wilder seed stays put
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = np.maximum(delta, 0.0)
+    loss = np.maximum(-delta, 0.0)
+    avg_gain = wilder_smooth(gain, period)
+    avg_loss = wilder_smooth(loss, period)
+    rs = avg_gain / np.where(avg_loss == 0, 1e-10, avg_loss)  # prevent division by zero
     rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return pd.Series(rsi, index=data.index)
 
 def compute_macd(data: pd.DataFrame, fast: int, slow: int, signal: int):
     """
@@ -32,14 +40,24 @@ def compute_macd(data: pd.DataFrame, fast: int, slow: int, signal: int):
 def compute_atr(data: pd.DataFrame, period: int) -> pd.Series:
     """
     Average True Range (ATR) for volatility-based stop sizing.
+    Smoothed with Wilder's RMA (the standard definition), matching the
+    fused kernel the live bot uses, so backtests size stops the same way.
     """
-    df = data.copy()
-    df["H-L"] = df["high"] - df["low"]
-    df["H-C"] = (df["high"] - df["close"].shift(1)).abs()
-    df["L-C"] = (df["low"] - df["close"].shift(1)).abs()
-    df["TR"] = df[["H-L", "H-C", "L-C"]].max(axis=1)
-    atr = df["TR"].rolling(window=period).mean()
-    return atr
+    high = data["high"].to_numpy()
+    low = data["low"].to_numpy()
+    close = data["close"].to_numpy()
+
+    prev_close = np.empty_like(close)
+    # No previous close on the first bar, so its TR falls back to high - low
+    # (same as the old .max(axis=1), which skipped the NaN columns)
+    prev_close[:1] = close[:1]
+    prev_close[1:] = close[:-1]
+
+    # True Range: max of (H-L, |H-prev C|, |L-prev C|) in one vectorized pass,
+    # no DataFrame copy or helper columns
+    tr = np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    atr = wilder_smooth(tr, period)
+    return pd.Series(atr, index=data.index)
 
 def compute_bollinger_bands(data: pd.DataFrame, period: int = 20, num_std: float = 2.0):
     """
@@ -47,16 +65,16 @@ def compute_bollinger_bands(data: pd.DataFrame, period: int = 20, num_std: float
     period: moving average period
     num_std: number of standard deviations for upper/lower bands
     """
-    df = data.copy()
+    close = data["close"]
     # Simple Moving Average
-    df["BB_mid"] = df["close"].rolling(window=period).mean()
+    mid = close.rolling(window=period).mean()
     # Standard Deviation
-    df["BB_std"] = df["close"].rolling(window=period).std()
-    
-    df["BB_upper"] = df["BB_mid"] + (num_std * df["BB_std"])
-    df["BB_lower"] = df["BB_mid"] - (num_std * df["BB_std"])
-    
-    return df["BB_upper"], df["BB_mid"], df["BB_lower"]
+    std = close.rolling(window=period).std()
+
+    upper = mid + (num_std * std)
+    lower = mid - (num_std * std)
+
+    return upper, mid, lower
 
 
 def compute_adx(data: pd.DataFrame, period: int = 14):
@@ -66,42 +84,85 @@ def compute_adx(data: pd.DataFrame, period: int = 14):
       - ADX < 20 => weak trend
       - ADX > 25-30 => strong trend.
     """
-    df = data.copy()
-    
-    # 1) Calculate price movement components
-    df["diff_high"] = df["high"].diff()
-    df["diff_low"] = df["low"].diff()
-    
+    high = data["high"].to_numpy()
+    low = data["low"].to_numpy()
+    close = data["close"].to_numpy()
+
+    # 1) Calculate price movement components (NaN first bar compares False,
+    #    so both DMs start at 0)
+    diff_high = np.diff(high, prepend=np.nan)
+    diff_low = np.diff(low, prepend=np.nan)
+
     # 2) Calculate +DM and -DM (both as positive values)
-    df["+DM"] = np.where((df["diff_high"] > df["diff_low"]) & (df["diff_high"] > 0), df["diff_high"], 0.0)
-    df["-DM"] = np.where((df["diff_low"] > df["diff_high"]) & (df["diff_low"] > 0), df["diff_low"], 0.0)
-    
-    # 3) True Range (TR)
-    df["TR_method1"] = df["high"] - df["low"]
-    df["TR_method2"] = (df["high"] - df["close"].shift(1)).abs()
-    df["TR_method3"] = (df["low"] - df["close"].shift(1)).abs()
-    df["TR"] = df[["TR_method1", "TR_method2", "TR_method3"]].max(axis=1)
-    
-    # 4) Apply Wilder's smoothing using ewm with alpha=1/period
-    df["+DM_smooth"] = df["+DM"].ewm(alpha=1/period, adjust=False).mean()
-    df["-DM_smooth"] = df["-DM"].ewm(alpha=1/period, adjust=False).mean()
-    df["TR_smooth"] = df["TR"].ewm(alpha=1/period, adjust=False).mean()
-    
+    plus_dm = np.where((diff_high > diff_low) & (diff_high > 0), diff_high, 0.0)
+    minus_dm = np.where((diff_low > diff_high) & (diff_low > 0), diff_low, 0.0)
+
+    # 3) True Range (TR): one vectorized max over the three candidates,
+    #    same as compute_atr (first bar falls back to high - low)
+    prev_close = np.empty_like(close)
+    prev_close[:1] = close[:1]
+    prev_close[1:] = close[:-1]
+    tr = np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+    # 4) Apply Wilder's smoothing via the compiled single-pass kernel
+    #    (seeded with the mean of the first `period` bars, as Wilder defined it)
+    plus_dm_smooth = wilder_smooth(plus_dm, period)
+    minus_dm_smooth = wilder_smooth(minus_dm, period)
+    tr_smooth = wilder_smooth(tr, period)
+
     # 5) Calculate +DI and -DI
-    df["+DI"] = 100 * (df["+DM_smooth"] / df["TR_smooth"])
-    df["-DI"] = 100 * (df["-DM_smooth"] / df["TR_smooth"])
-    
+    plus_di = 100 * (plus_dm_smooth / tr_smooth)
+    minus_di = 100 * (minus_dm_smooth / tr_smooth)
+
     # 6) Calculate DX
-    df["DX"] = ( (df["+DI"] - df["-DI"]).abs() / (df["+DI"] + df["-DI"]) ) * 100
-    
+    dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+
     # 7) Finally, compute ADX using Wilder's smoothing on DX
-    df["ADX"] = df["DX"].ewm(alpha=1/period, adjust=False).mean()
-    
-    return df["ADX"]
+    adx = wilder_smooth(dx, period)
 
+    return pd.Series(adx, index=data.index, name="ADX")
 
 
-# indicators.py
+
+def compute_all_indicators(data: pd.DataFrame, rsi_period: int, macd_fast: int,
+                           macd_slow: int, macd_signal: int, atr_period: int,
+                           adx_period: int = 14, bb_period: int = 20,
+                           bb_num_std: float = 2.0) -> pd.DataFrame:
+    """
+    Compute every indicator column in a single fused pass over the OHLC
+    arrays (see _njit.compute_all) and return a new DataFrame with the
+    original columns plus RSI, MACD, MACD_signal, histogram, ATR,
+    BB_upper/BB_mid/BB_lower, ADX, BullishEngulfing and Hammer.
+
+    Equivalent to calling the individual compute_* functions, but the data
+    is traversed once instead of once per indicator.
+    """
+    o = data["open"].to_numpy(dtype=np.float64)
+    h = data["high"].to_numpy(dtype=np.float64)
+    l = data["low"].to_numpy(dtype=np.float64)
+    c = data["close"].to_numpy(dtype=np.float64)
+
+    (rsi, macd, macd_sig, hist, atr, bb_up, bb_mid, bb_lo,
+     adx, bull, hammer) = compute_all(o, h, l, c, rsi_period, macd_fast,
+                                      macd_slow, macd_signal, atr_period,
+                                      adx_period, bb_period, bb_num_std)
+
+    out = {col: data[col].to_numpy() for col in data.columns}
+    out.update({
+        "RSI": rsi,
+        "MACD": macd,
+        "MACD_signal": macd_sig,
+        "histogram": hist,
+        "ATR": atr,
+        "BB_upper": bb_up,
+        "BB_mid": bb_mid,
+        "BB_lower": bb_lo,
+        "ADX": adx,
+        "BullishEngulfing": bull,
+        "Hammer": hammer,
+    })
+    return pd.DataFrame(out, index=data.index)
+
 
 def detect_candlestick_patterns(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -109,38 +170,37 @@ def detect_candlestick_patterns(df: pd.DataFrame) -> pd.DataFrame:
       - Bullish Engulfing
       - Hammer
     We'll keep it simple for demonstration.
+    Fully vectorized: boolean masks over the whole OHLC arrays instead of a
+    per-row Python loop.
     """
-    df["BullishEngulfing"] = 0
-    df["Hammer"] = 0
-    
-    for i in range(1, len(df)):
-        prev_open = df["open"].iloc[i - 1]
-        prev_close = df["close"].iloc[i - 1]
-
-        curr_open = df["open"].iloc[i]
-        curr_close = df["close"].iloc[i]
-        curr_high = df["high"].iloc[i]
-        curr_low = df["low"].iloc[i]
-        
-        # 1) Bullish Engulfing:
-        #   - Previous bar is bearish (close < open)
-        #   - Current bar is bullish (close > open)
-        #   - Current bar's body fully engulfs the previous bar's body
-        if (prev_close < prev_open) and (curr_close > curr_open) and \
-           (curr_close > prev_open) and (curr_open < prev_close):
-            df.at[df.index[i], "BullishEngulfing"] = 1
-        
-        # 2) Hammer:
-        #   - Hammer typically has a small real body near the top of the range
-        #   - Long lower shadow, short or no upper shadow
-        body = abs(curr_close - curr_open)
-        upper_shadow = curr_high - max(curr_close, curr_open)
-        lower_shadow = min(curr_close, curr_open) - curr_low
-
-        # Simplistic ratio approach
-        if body <= (0.3 * (curr_high - curr_low)) and lower_shadow >= (2 * body):
-            # That’s a naive "hammer" detection
-            df.at[df.index[i], "Hammer"] = 1
+    o, h, l, c = df[["open", "high", "low", "close"]].to_numpy().T
+
+    prev_o = np.roll(o, 1)
+    prev_c = np.roll(c, 1)
+
+    # 1) Bullish Engulfing:
+    #   - Previous bar is bearish (close < open)
+    #   - Current bar is bullish (close > open)
+    #   - Current bar's body fully engulfs the previous bar's body
+    engulfing = (prev_c < prev_o) & (c > o) & (c > prev_o) & (o < prev_c)
+
+    # 2) Hammer:
+    #   - Hammer typically has a small real body near the top of the range
+    #   - Long lower shadow, short or no upper shadow
+    body = np.abs(c - o)
+    rng = h - l
+    lower_shadow = np.minimum(c, o) - l
+
+    # Simplistic ratio approach
+    hammer = (body <= 0.3 * rng) & (lower_shadow >= 2 * body)
+
+    # First bar has no previous bar; keep it flagged 0 as before
+    if len(df) > 0:
+        engulfing[0] = False
+        hammer[0] = False
+
+    df.loc[:, "BullishEngulfing"] = engulfing.astype(np.int8)
+    df.loc[:, "Hammer"] = hammer.astype(np.int8)
 
     return df
 
@@ -1,5 +1,11 @@
 import asyncio
+import contextlib
+import io
+import queue
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import numpy as np
 import pandas as pd
 
 from config import (
@@ -28,30 +34,393 @@ from utils import (
     close_all_trades,
     notify_trade
 )
-from strategy import generate_combined_signal, apply_indicators, get_higher_timeframe_trend
+from strategy import generate_combined_signal, apply_indicators, trend_from_dataframe, IndicatorState
 from indicators import detect_candlestick_patterns
 
-def compute_unrealized_pnl(trade: dict, current_price: float, pip_value: float = 0.0001) -> float:
-    if trade["side"].upper() == "BUY":
-        return (current_price - trade["entry_price"]) * trade["units"] * pip_value
+@dataclass(slots=True)
+class Trade:
+    """
+    One open trade in attribute form, for the per-trade codepaths (order
+    closing, notifications, scalar P&L). Slot attributes replace the old
+    trade dicts: no hash lookup per field and no .upper() per access —
+    the side is stored once as a bool.
+    """
+    instrument: str
+    side_is_buy: bool
+    entry_price: float
+    units: float
+    order_id: object
+    extreme_price: float     # running max (BUY) / min (SELL)
+    take_profit_price: float
+
+    @property
+    def side(self) -> str:
+        return "BUY" if self.side_is_buy else "SELL"
+
+    def to_record_dict(self) -> dict:
+        """The legacy dict shape that utils (notify_trade, close_all_trades)
+        expects, with max_price/min_price split by side."""
+        return {
+            "instrument": self.instrument,
+            "side": self.side,
+            "entry_price": self.entry_price,
+            "units": self.units,
+            "order_id": self.order_id,
+            "max_price": self.extreme_price if self.side_is_buy else None,
+            "min_price": self.extreme_price if not self.side_is_buy else None,
+            "take_profit_price": self.take_profit_price,
+        }
+
+
+class OpenTrades:
+    """
+    Struct-of-arrays container for the open trades: the numeric fields live
+    in parallel NumPy arrays so unrealized P&L, trailing-stop eligibility
+    and stop-hit tests are single vectorized expressions instead of a
+    Python loop over trade dicts. Instruments and order ids stay in plain
+    lists; only adding/removing a trade touches individual elements.
+    """
+
+    def __init__(self):
+        self.instruments = []
+        self.order_ids = []
+        self.side_sign = np.empty(0)        # +1 for BUY, -1 for SELL
+        self.entry_price = np.empty(0)
+        self.units = np.empty(0)
+        self.extreme_price = np.empty(0)    # running max (BUY) / min (SELL)
+        self.take_profit_price = np.empty(0)
+
+    def __len__(self):
+        return len(self.instruments)
+
+    def append(self, instrument, side, entry_price, units, order_id, take_profit_price):
+        self.instruments.append(instrument)
+        self.order_ids.append(order_id)
+        self.side_sign = np.append(self.side_sign, 1.0 if side.upper() == "BUY" else -1.0)
+        self.entry_price = np.append(self.entry_price, entry_price)
+        self.units = np.append(self.units, units)
+        self.extreme_price = np.append(self.extreme_price, entry_price)
+        self.take_profit_price = np.append(self.take_profit_price, take_profit_price)
+
+    def remove(self, i):
+        self.instruments.pop(i)
+        self.order_ids.pop(i)
+        self.side_sign = np.delete(self.side_sign, i)
+        self.entry_price = np.delete(self.entry_price, i)
+        self.units = np.delete(self.units, i)
+        self.extreme_price = np.delete(self.extreme_price, i)
+        self.take_profit_price = np.delete(self.take_profit_price, i)
+
+    def record(self, i) -> Trade:
+        """Materialize one trade as a Trade for the per-trade codepaths."""
+        return Trade(
+            instrument=self.instruments[i],
+            side_is_buy=bool(self.side_sign[i] > 0),
+            entry_price=float(self.entry_price[i]),
+            units=float(self.units[i]),
+            order_id=self.order_ids[i],
+            extreme_price=float(self.extreme_price[i]),
+            take_profit_price=float(self.take_profit_price[i]),
+        )
+
+    def records(self) -> list:
+        """All trades in the legacy dict shape, for the utils boundary."""
+        return [self.record(i).to_record_dict() for i in range(len(self))]
+
+    @classmethod
+    def from_records(cls, records):
+        """Rebuild from legacy dict records (e.g. what close_all_trades returns)."""
+        trades = cls()
+        for t in records or []:
+            trades.append(t["instrument"], t["side"], t["entry_price"],
+                          t["units"], t["order_id"], t["take_profit_price"])
+            is_buy = t["side"].upper() == "BUY"
+            extreme = t.get("max_price") if is_buy else t.get("min_price")
+            if extreme is not None:
+                trades.extreme_price[-1] = extreme
+        return trades
+
+    def update_extremes(self, prices: np.ndarray):
+        """Track the best price seen per trade (NaN prices are ignored)."""
+        buy = self.side_sign > 0
+        self.extreme_price = np.where(buy,
+                                      np.fmax(self.extreme_price, prices),
+                                      np.fmin(self.extreme_price, prices))
+
+    def unrealized_pnl(self, prices: np.ndarray, pip_value: float = 0.0001) -> np.ndarray:
+        return self.side_sign * (prices - self.entry_price) * self.units * pip_value
+
+    def trailing_state(self, prices: np.ndarray, trail_dist: float):
+        """
+        Vectorized trailing-stop evaluation. Returns (eligible, levels, hit):
+        trades are eligible once their favourable move exceeds the profit
+        threshold, and hit once the price crosses back through the trailing
+        level. NaN prices are never eligible.
+        """
+        buy = self.side_sign > 0
+        threshold = np.where(buy,
+                             (self.take_profit_price - self.entry_price) * 0.35,
+                             (self.entry_price - self.take_profit_price) * 0.5)
+        progress = self.side_sign * (prices - self.entry_price)
+        eligible = progress > threshold
+        levels = self.extreme_price - self.side_sign * trail_dist
+        hit = eligible & np.where(buy, prices < levels, prices > levels)
+        return eligible, levels, hit
+
+
+def compute_unrealized_pnl(trade: Trade, current_price: float, pip_value: float = 0.0001) -> float:
+    sign = 1.0 if trade.side_is_buy else -1.0
+    return sign * (current_price - trade.entry_price) * trade.units * pip_value
+
+
+async def resolve_current_prices(client, open_trades, latest_prices):
+    """
+    Current price per open trade as one array, reusing this cycle's prices
+    and falling back to a single-candle fetch (NaN if that fails too).
+    """
+    prices = np.full(len(open_trades), np.nan)
+    for i, inst in enumerate(open_trades.instruments):
+        price = latest_prices.get(inst)
+        if price is None:
+            df_temp = await asyncio.to_thread(fetch_ohlc_data, client, inst, TIMEFRAME, 1)
+            if df_temp.empty:
+                continue
+            price = df_temp["close"].iloc[-1]
+            latest_prices[inst] = price
+        prices[i] = price
+    return prices
+
+# Bars fetched per refresh once an instrument's rolling buffer is warm;
+# only ~1 bar per minute is actually new, the rest covers catch-up gaps
+INCREMENTAL_FETCH_COUNT = 10
+
+
+def merge_into_buffer(buffers, instrument, df, max_bars=200):
+    """
+    Fold freshly fetched candles into the instrument's rolling OHLC window:
+    append only the bars newer than the buffer's last timestamp and trim to
+    max_bars. Returns the updated window (the fetched frame as-is on the
+    first, warm-up call). An empty fetch is returned as-is — not the cached
+    window — so the caller treats the instrument as having no data this
+    cycle instead of trading on stale quotes.
+
+    If every fetched bar is newer than the window's tail, the gap since the
+    last cycle may be wider than the fetch (e.g. the overnight trading
+    pause) and the window cannot be trusted: the buffer is dropped and None
+    is returned so the caller refetches the full history.
+    """
+    buf = buffers.get(instrument)
+    if buf is None or buf.empty:
+        merged = df
+    elif df.empty:
+        # Feed failure: serving the cached window here would let the bot
+        # keep signalling and pricing trades off an arbitrarily old close.
+        # Return the empty frame so the caller skips the instrument this
+        # cycle (as an empty fetch always did); the window is kept for the
+        # next attempt.
+        return df
     else:
-        return (trade["entry_price"] - current_price) * trade["units"] * pip_value
-
-async def fetch_all_instruments(client, instruments, timeframe, count=200):
-    tasks = [asyncio.to_thread(fetch_ohlc_data, client, instrument, timeframe, count) for instrument in instruments]
+        new = df[df.index > buf.index[-1]]
+        if len(new) == len(df):
+            buffers.pop(instrument, None)
+            return None
+        merged = pd.concat([buf, new]) if not new.empty else buf
+    if len(merged) > max_bars:
+        merged = merged.iloc[-max_bars:]
+    buffers[instrument] = merged
+    return merged
+
+
+async def fetch_all_instruments(client, instruments, timeframe, count=200,
+                                trend_timeframes=("M15", "M5"), trend_count=50,
+                                buffers=None):
+    """
+    Fetch the signal timeframe plus every higher-timeframe trend window for
+    all instruments in a single concurrent batch, instead of issuing the
+    trend requests serially inside the per-instrument loop.
+
+    When a buffers dict is passed, each instrument keeps a rolling signal-
+    timeframe window in it: warm instruments only fetch the last few
+    candles and the fetch is merged into the window, so the 200-bar
+    history is not re-downloaded every cycle.
+    Returns {instrument: {timeframe: DataFrame}}.
+    """
+    tasks = []
+    keys = []
+    for instrument in instruments:
+        n = count
+        if buffers is not None and instrument in buffers and not buffers[instrument].empty:
+            n = INCREMENTAL_FETCH_COUNT
+        tasks.append(asyncio.to_thread(fetch_ohlc_data, client, instrument, timeframe, n))
+        keys.append((instrument, timeframe))
+        for tf in trend_timeframes:
+            tasks.append(asyncio.to_thread(fetch_ohlc_data, client, instrument, tf, trend_count))
+            keys.append((instrument, tf))
     results = await asyncio.gather(*tasks)
-    return dict(zip(instruments, results))
+    data = {instrument: {} for instrument in instruments}
+    stale = []
+    for (instrument, tf), df in zip(keys, results):
+        if buffers is not None and tf == timeframe:
+            merged = merge_into_buffer(buffers, instrument, df, max_bars=count)
+            if merged is None:
+                # Data gap wider than the incremental fetch: the window was
+                # dropped, refetch the full history for this instrument below
+                stale.append(instrument)
+                continue
+            df = merged
+        data[instrument][tf] = df
+    if stale:
+        refetched = await asyncio.gather(
+            *[asyncio.to_thread(fetch_ohlc_data, client, instrument, timeframe, count)
+              for instrument in stale])
+        for instrument, df in zip(stale, refetched):
+            data[instrument][timeframe] = merge_into_buffer(buffers, instrument, df, max_bars=count)
+    return data
+
+def setup_async_logging():
+    """
+    Move the logger's handlers behind a QueueListener thread so file and
+    console writes happen off the event loop; the loop only enqueues
+    records. Idempotent; returns the started listener (or None).
+    """
+    if any(isinstance(h, QueueHandler) for h in logger.handlers):
+        return None
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+async def alert_worker(alert_queue):
+    """
+    Drain queued email alerts in the background. The SMTP round-trip
+    (connect + auth + send, easily hundreds of ms) runs in a thread so it
+    never blocks the trade-decision loop.
+    """
+    while True:
+        subject, body = await alert_queue.get()
+        try:
+            await asyncio.to_thread(send_email_alert, subject, body)
+        except Exception as e:
+            logger.error(f"Failed to send alert email: {e}")
+        finally:
+            alert_queue.task_done()
+
+
+def compute_signals_phase(instrument_data, indicator_states):
+    """
+    Pure-compute phase of the main loop: update the streaming indicator
+    state, run the fused indicator pass and the signal/trend confirmation
+    logic for every instrument. No network or log I/O happens here: the
+    log lines — including the signal functions' stdout diagnostics, which
+    are captured — are returned as (level, message) pairs and emitted in
+    one batch afterwards.
+
+    Returns (decisions, latest_prices, log_lines) where decisions holds one
+    dict per confirmed BUY/SELL: instrument, signal, price and atr.
+    """
+    decisions = []
+    latest_prices = {}
+    log_lines = []
+
+    for instrument, frames in instrument_data.items():
+        df = frames[TIMEFRAME]
+        if df.empty or len(df) < 50:
+            log_lines.append(("warning", f"No sufficient data for {instrument}."))
+            continue
+
+        state = indicator_states.get(instrument)
+        if state is None:
+            state = IndicatorState(RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL, ATR_PERIOD)
+            indicator_states[instrument] = state
+        state.update_from_dataframe(df)
+
+        df = apply_indicators(df, RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL, ATR_PERIOD)
+        df.dropna(inplace=True)
+        df = detect_candlestick_patterns(df)
+        latest_price = df["close"].iloc[-1]
+        latest_prices[instrument] = latest_price
+
+        # --- Adapt to Market Regime: Skip trade if market is flat (ADX < 30) ---
+        adx = state.adx
+        log_lines.append(("info", f"{instrument}: Current ADX is {adx:.2f}."))
+        if adx < 25:
+            log_lines.append(("info", f"{instrument}: ADX ({adx:.2f}) indicates a flat market. Skipping trade."))
+            continue
+
+        # --- Step 2: M15 and M5 Trends (candles already prefetched) ---
+        trend_M15 = trend_from_dataframe(frames["M15"])
+        trend_M5 = trend_from_dataframe(frames["M5"])
+        log_lines.append(("info", f"{instrument} trends => M15: {trend_M15}, M5: {trend_M5}"))
+
+        # --- Generate Signal from M1 Data ---
+        # The signal functions print their condition-by-condition
+        # diagnostics to stdout; capture those and fold them into the
+        # batched log lines so no I/O interleaves with the compute phase.
+        diag = io.StringIO()
+        with contextlib.redirect_stdout(diag):
+            signal = generate_combined_signal(df, htf_trend=None)
+        for line in diag.getvalue().splitlines():
+            log_lines.append(("info", f"{instrument}: {line}"))
+        log_lines.append(("info", f"{instrument} M1 signal: {signal}"))
+
+        # --- Step 3: Use Trend Confirmation ---
+        confirmed_signal = "FLAT"
+        if signal == "BUY" and trend_M15 == "up" and trend_M5 == "up":
+            confirmed_signal = "BUY"
+        elif signal == "SELL" and trend_M15 == "down" and trend_M5 == "down":
+            confirmed_signal = "SELL"
+        else:
+            log_lines.append(("info", f"{instrument} signal not confirmed by M5/M15 trends; skipping trade."))
+
+        if confirmed_signal in ["BUY", "SELL"]:
+            decisions.append({
+                "instrument": instrument,
+                "signal": confirmed_signal,
+                "price": latest_price,
+                "atr": state.atr,
+            })
+
+    return decisions, latest_prices, log_lines
+
 
 async def main_async():
     client = get_oanda_client()
+
+    # Alerts and log records are queued and handled off the hot path.
+    # The task reference must stay alive for the whole run: the event loop
+    # only keeps a weak reference, and a collected worker would silently
+    # stop sending alert emails.
+    setup_async_logging()
+    alert_queue = asyncio.Queue()
+    alert_task = asyncio.create_task(alert_worker(alert_queue))
+
+    def on_alert_worker_done(task):
+        if not task.cancelled():
+            logger.error(f"Alert worker exited unexpectedly: {task.exception()!r}")
+
+    alert_task.add_done_callback(on_alert_worker_done)
+
+    def queue_alert(subject, body):
+        alert_queue.put_nowait((subject, body))
+
     daily_trade_count = 0
     consecutive_losses = 0
     MAX_CONSECUTIVE_LOSSES = 3  # Stop trading after 3 losses in a row
     start_of_day_equity = None
     last_date = None
 
-    # List to track open trades
-    open_trades = []
+    # Open trades, stored as parallel arrays (see OpenTrades)
+    open_trades = OpenTrades()
+
+    # Streaming indicator state per instrument: warmed up from the first
+    # fetch, then updated in O(1) with only the bars that are actually new
+    indicator_states = {}
+
+    # Rolling OHLC window per instrument; once warm, each cycle fetches only
+    # the last few candles instead of re-downloading the whole history
+    ohlc_buffers = {}
 
     logger.info("Starting live day-trading bot with Asynchronous Data Fetching...")
 
@@ -88,170 +457,102 @@ async def main_async():
 
             if dd_pct <= -DAILY_DRAWDOWN_LIMIT_PCT:
                 logger.warning(f"Daily drawdown {dd_pct:.2f}% exceeds limit. Halting new trades.")
-                send_email_alert("Daily Drawdown Alert", f"Daily drawdown {dd_pct:.2f}% exceeds limit. Halting new trades.")
+                queue_alert("Daily Drawdown Alert", f"Daily drawdown {dd_pct:.2f}% exceeds limit. Halting new trades.")
                 await asyncio.sleep(60)
                 continue
 
-            # --- Fetch Data ---
-            instrument_data = await fetch_all_instruments(client, INSTRUMENTS, TIMEFRAME, count=200)
-            latest_prices = {}
+            # --- Phase 1: Fetch Data (one concurrent batch) ---
+            instrument_data = await fetch_all_instruments(client, INSTRUMENTS, TIMEFRAME, count=200,
+                                                          buffers=ohlc_buffers)
 
-            for instrument, df in instrument_data.items():
-                if df.empty or len(df) < 50:
-                    logger.warning(f"No sufficient data for {instrument}.")
-                    continue
+            # --- Phase 2: Compute indicators/signals, then flush logs in one batch ---
+            decisions, latest_prices, log_lines = compute_signals_phase(instrument_data, indicator_states)
+            for level, message in log_lines:
+                getattr(logger, level)(message)
 
-                df = apply_indicators(df, RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL, ATR_PERIOD)
-                df.dropna(inplace=True)
-                df = detect_candlestick_patterns(df)
-                latest_price = df["close"].iloc[-1]
-                latest_prices[instrument] = latest_price
-
-                # --- Adapt to Market Regime: Skip trade if market is flat (ADX < 30) ---
-                adx = df["ADX"].iloc[-1]
-                logger.info(f"{instrument}: Current ADX is {adx:.2f}.")
-                if adx < 25:
-                    logger.info(f"{instrument}: ADX ({adx:.2f}) indicates a flat market. Skipping trade.")
+            # --- Phase 3: Execute trade decisions ---
+            for decision in decisions:
+                # --- Tighten Risk Management: Check trade limits ---
+                if daily_trade_count >= MAX_TRADES_PER_DAY or consecutive_losses >= MAX_CONSECUTIVE_LOSSES:
+                    logger.info("Trade cap reached for today. Skipping new trade signals.")
                     continue
 
-
-                # --- Step 2: Retrieve M15 and M5 Trends ---
-                trend_M15 = get_higher_timeframe_trend(client, instrument, higher_tf="M15", count=50)
-                trend_M5  = get_higher_timeframe_trend(client, instrument, higher_tf="M5", count=50)
-                logger.info(f"{instrument} trends => M15: {trend_M15}, M5: {trend_M5}")
-
-                # --- Generate Signal from M1 Data ---
-                signal = generate_combined_signal(df, htf_trend=None)
-                logger.info(f"{instrument} M1 signal: {signal}")
-
-                # --- Step 3: Use Trend Confirmation ---
-                confirmed_signal = "FLAT"
-                if signal == "BUY" and trend_M15 == "up" and trend_M5 == "up":
-                    confirmed_signal = "BUY"
-                elif signal == "SELL" and trend_M15 == "down" and trend_M5 == "down":
-                    confirmed_signal = "SELL"
-                else:
-                    logger.info(f"{instrument} signal not confirmed by M5/M15 trends; skipping trade.")
-
-                # Only proceed if confirmed_signal is BUY or SELL
-                if confirmed_signal in ["BUY", "SELL"]:
-                    # --- Tighten Risk Management: Check trade limits ---
-                    if daily_trade_count >= MAX_TRADES_PER_DAY or consecutive_losses >= MAX_CONSECUTIVE_LOSSES:
-                        logger.info("Trade cap reached for today. Skipping new trade signals.")
-                        continue
-
-                    balance = get_account_balance(client, OANDA_ACCOUNT_ID)
-                    atr_value = df["ATR"].iloc[-1]
-                    current_price = latest_price
-
-                    # Calculate dynamic position size
-                    position_size = calculate_dynamic_position_size(balance, RISK_PER_TRADE, atr_value, current_price)
-
-                    # --- Improve Stop/Target Placement: ATR-based SL and TP ---
-                    atr_in_pips = atr_value * 10000
-                    stop_loss_multiplier = 1.5  # Adjust multiplier as needed
-                    reward_factor = 2.0         # Aim for at least a 2:1 reward-to-risk ratio
-
-                    stop_loss_pips = atr_in_pips * stop_loss_multiplier
-
-                    if confirmed_signal.upper() == "BUY":
-                        stop_loss_price = current_price - (stop_loss_pips * 0.0001)
-                        take_profit_price = current_price + (stop_loss_pips * 0.0001 * reward_factor)
-                    else:  # SELL signal
-                        stop_loss_price = current_price + (stop_loss_pips * 0.0001)
-                        take_profit_price = current_price - (stop_loss_pips * 0.0001 * reward_factor)
-
-                    order_id = place_order(client, instrument, confirmed_signal, position_size, stop_loss_price, take_profit_price)
-                    if order_id is not None:
-                        daily_trade_count += 1
-                        open_trade = {
-                            "instrument": instrument,
-                            "side": confirmed_signal,
-                            "entry_price": current_price,
-                            "units": position_size,
-                            "order_id": order_id,
-                            "max_price": current_price if confirmed_signal.upper() == "BUY" else None,
-                            "min_price": current_price if confirmed_signal.upper() == "SELL" else None,
-                            "take_profit_price": take_profit_price
-                        }
-                        open_trades.append(open_trade)
-                        notify_trade(open_trade)
+                instrument = decision["instrument"]
+                confirmed_signal = decision["signal"]
+                # Balance fetched once at the top of this cycle; no need
+                # for another REST round-trip per instrument
+                balance = current_balance
+                atr_value = decision["atr"]
+                current_price = decision["price"]
+
+                # Calculate dynamic position size
+                position_size = calculate_dynamic_position_size(balance, RISK_PER_TRADE, atr_value, current_price)
+
+                # --- Improve Stop/Target Placement: ATR-based SL and TP ---
+                # ATR is already in price terms: atr*10000*mult*0.0001 is just atr*mult
+                stop_loss_multiplier = 1.5  # Adjust multiplier as needed
+                reward_factor = 2.0         # Aim for at least a 2:1 reward-to-risk ratio
+
+                stop_dist = atr_value * stop_loss_multiplier
+                tp_dist = stop_dist * reward_factor
+                sign = 1.0 if confirmed_signal.upper() == "BUY" else -1.0
+                stop_loss_price = current_price - sign * stop_dist
+                take_profit_price = current_price + sign * tp_dist
+
+                order_id = place_order(client, instrument, confirmed_signal, position_size, stop_loss_price, take_profit_price)
+                if order_id is not None:
+                    daily_trade_count += 1
+                    open_trades.append(instrument, confirmed_signal, current_price,
+                                       position_size, order_id, take_profit_price)
+                    notify_trade(open_trades.record(len(open_trades) - 1).to_record_dict())
 
             # --- Trailing Stop Loss Logic ---
-            for trade in open_trades.copy():
-                inst = trade["instrument"]
-                current_price = latest_prices.get(inst)
-                if current_price is None:
-                    df_temp = await asyncio.to_thread(fetch_ohlc_data, client, inst, TIMEFRAME, 1)
-                    if df_temp.empty:
-                        continue
-                    current_price = df_temp["close"].iloc[-1]
-
-                # Activate trailing stop only after the trade is in profit by at least 30% of the target gain
-                if trade["side"].upper() == "BUY":
-                    if current_price > trade["max_price"]:
-                        trade["max_price"] = current_price
-                    profit_threshold = (trade["take_profit_price"] - trade["entry_price"]) * 0.35
-                    if (current_price - trade["entry_price"]) > profit_threshold:
-                        trailing_stop_level = trade["max_price"] - (TRAILING_STOP_PIPS * 0.0001)
-                        logger.info(f"{inst} BUY trade: current price {current_price:.5f}, trailing stop level {trailing_stop_level:.5f}")
-                        if current_price < trailing_stop_level:
-                            logger.warning(f"Trailing stop hit for {inst} BUY trade. Closing trade.")
-                            send_email_alert("Trailing Stop Alert", f"Trailing stop hit for {inst} BUY trade. Trade closed.")
-                            if close_all_trades(client, [trade]) == []:
-                                open_trades.remove(trade)
-                                profit = compute_unrealized_pnl(trade, current_price)
-                                if profit < 0:
-                                    consecutive_losses += 1
-                                else:
-                                    consecutive_losses = 0
-                    else:
-                        logger.info(f"{inst} BUY trade not yet eligible for trailing stop adjustment.")
-                elif trade["side"].upper() == "SELL":
-                    if current_price < trade["min_price"]:
-                        trade["min_price"] = current_price
-                    profit_threshold = (trade["entry_price"] - trade["take_profit_price"]) * 0.5
-                    if (trade["entry_price"] - current_price) > profit_threshold:
-                        trailing_stop_level = trade["min_price"] + (TRAILING_STOP_PIPS * 0.0001)
-                        logger.info(f"{inst} SELL trade: current price {current_price:.5f}, trailing stop level {trailing_stop_level:.5f}")
-                        if current_price > trailing_stop_level:
-                            logger.warning(f"Trailing stop hit for {inst} SELL trade. Closing trade.")
-                            send_email_alert("Trailing Stop Alert", f"Trailing stop hit for {inst} SELL trade. Trade closed.")
-                            if close_all_trades(client, [trade]) == []:
-                                open_trades.remove(trade)
-                                profit = compute_unrealized_pnl(trade, current_price)
-                                if profit < 0:
-                                    consecutive_losses += 1
-                                else:
-                                    consecutive_losses = 0
-                    else:
-                        logger.info(f"{inst} SELL trade not yet eligible for trailing stop adjustment.")
-
-            # --- Risk Management: Total Unrealized Loss ---
             total_unrealized_loss = 0.0
-            for trade in open_trades:
-                inst = trade["instrument"]
-                current_price = latest_prices.get(inst)
-                if current_price is None:
-                    df_temp = await asyncio.to_thread(fetch_ohlc_data, client, inst, TIMEFRAME, 1)
-                    if df_temp.empty:
+            if len(open_trades) > 0:
+                prices = await resolve_current_prices(client, open_trades, latest_prices)
+                open_trades.update_extremes(prices)
+                # Activate trailing stop only after the trade is in profit by at least 30% of the target gain
+                eligible, trailing_levels, hit = open_trades.trailing_state(prices, TRAILING_STOP_PIPS * 0.0001)
+
+                # Walk backwards so removing a closed trade keeps indices valid
+                for i in reversed(range(len(open_trades))):
+                    if np.isnan(prices[i]):
+                        continue
+                    inst = open_trades.instruments[i]
+                    side = "BUY" if open_trades.side_sign[i] > 0 else "SELL"
+                    if not eligible[i]:
+                        logger.info(f"{inst} {side} trade not yet eligible for trailing stop adjustment.")
                         continue
-                    current_price = df_temp["close"].iloc[-1]
-                pnl = compute_unrealized_pnl(trade, current_price)
-                if pnl < 0:
-                    total_unrealized_loss += pnl
+                    logger.info(f"{inst} {side} trade: current price {prices[i]:.5f}, trailing stop level {trailing_levels[i]:.5f}")
+                    if hit[i]:
+                        logger.warning(f"Trailing stop hit for {inst} {side} trade. Closing trade.")
+                        queue_alert("Trailing Stop Alert", f"Trailing stop hit for {inst} {side} trade. Trade closed.")
+                        if close_all_trades(client, [open_trades.record(i).to_record_dict()]) == []:
+                            profit = compute_unrealized_pnl(open_trades.record(i), prices[i])
+                            open_trades.remove(i)
+                            if profit < 0:
+                                consecutive_losses += 1
+                            else:
+                                consecutive_losses = 0
+
+                # --- Risk Management: Total Unrealized Loss (one vectorized pass) ---
+                if len(open_trades) > 0:
+                    # Re-resolve after removals; prices are cached in latest_prices
+                    prices = await resolve_current_prices(client, open_trades, latest_prices)
+                    pnl = open_trades.unrealized_pnl(prices)
+                    total_unrealized_loss = pnl[(pnl < 0) & ~np.isnan(pnl)].sum()
 
             daily_loss_limit = start_of_day_equity * (DAILY_DRAWDOWN_LIMIT_PCT / 100.0)
             if abs(total_unrealized_loss) >= daily_loss_limit:
                 logger.warning(f"Total unrealized loss ({abs(total_unrealized_loss):.2f}) reached daily limit ({daily_loss_limit:.2f}). Closing trades.")
-                send_email_alert("Daily Loss Limit Exceeded", f"Total unrealized loss of {abs(total_unrealized_loss):.2f} reached/exceeded daily limit of {daily_loss_limit:.2f}. Closing trades.")
-                open_trades = close_all_trades(client, open_trades)
+                queue_alert("Daily Loss Limit Exceeded", f"Total unrealized loss of {abs(total_unrealized_loss):.2f} reached/exceeded daily limit of {daily_loss_limit:.2f}. Closing trades.")
+                open_trades = OpenTrades.from_records(close_all_trades(client, open_trades.records()))
 
             await asyncio.sleep(60)
 
         except Exception as e:
             logger.error(f"Unexpected error in main loop: {e}")
-            send_email_alert("Trading Bot Error", f"Unexpected error: {e}")
+            queue_alert("Trading Bot Error", f"Unexpected error: {e}")
             await asyncio.sleep(60)
 
 if __name__ == "__main__":
@@ -1,19 +1,207 @@
+import math
+from dataclasses import dataclass, fields
+
 import pandas as pd
-from indicators import (
-    compute_rsi,
-    compute_macd,
-    compute_atr,
-    compute_bollinger_bands,
-    compute_adx,
-    detect_candlestick_patterns
-)
+from indicators import compute_all_indicators
 
-def get_higher_timeframe_trend(client, instrument, higher_tf="M15", count=50):
-    from utils import fetch_ohlc_data  # reuse your existing function
-    df = fetch_ohlc_data(client, instrument, timeframe=higher_tf, count=count)
-    if df.empty or len(df) < 20:
+
+@dataclass
+class IndicatorState:
+    """
+    Streaming indicator state for one instrument.
+
+    Holds the smoothing state (MACD EMAs, Wilder averages for RSI/ATR/ADX)
+    so each new bar is an O(1) scalar update instead of recomputing the
+    whole lookback window. The recurrences mirror _njit.compute_all, so
+    once warmed up the streamed values track a full recompute over the
+    same bars.
+    """
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal_period: int = 9
+    atr_period: int = 14
+    adx_period: int = 14
+
+    bars_seen: int = 0
+    last_time: object = None
+
+    # previous bar, needed for TR / directional movement / RSI delta
+    prev_close: float = math.nan
+    prev_high: float = math.nan
+    prev_low: float = math.nan
+
+    # MACD state
+    ema_fast: float = math.nan
+    ema_slow: float = math.nan
+    signal_ema: float = math.nan
+    macd: float = math.nan
+
+    # RSI state (warm-up accumulators, then Wilder averages)
+    gain_acc: float = 0.0
+    loss_acc: float = 0.0
+    avg_gain: float = math.nan
+    avg_loss: float = math.nan
+    rsi: float = math.nan
+
+    # ATR state
+    tr_acc: float = 0.0
+    atr: float = math.nan
+
+    # ADX state
+    trs_acc: float = 0.0
+    pdm_acc: float = 0.0
+    mdm_acc: float = 0.0
+    tr_rma: float = math.nan
+    plus_dm_rma: float = math.nan
+    minus_dm_rma: float = math.nan
+    dx_acc: float = 0.0
+    dx_count: int = 0
+    adx: float = math.nan
+
+    def update(self, o: float, h: float, l: float, c: float) -> None:
+        """Fold one new bar into the running indicator state."""
+        i = self.bars_seen
+
+        # MACD
+        if i == 0:
+            self.ema_fast = c
+            self.ema_slow = c
+        else:
+            self.ema_fast += (2.0 / (self.macd_fast + 1.0)) * (c - self.ema_fast)
+            self.ema_slow += (2.0 / (self.macd_slow + 1.0)) * (c - self.ema_slow)
+        self.macd = self.ema_fast - self.ema_slow
+        if i == 0:
+            self.signal_ema = self.macd
+        else:
+            self.signal_ema += (2.0 / (self.macd_signal_period + 1.0)) * (self.macd - self.signal_ema)
+
+        # True Range and directional movement
+        if i == 0:
+            tr = h - l
+            pdm = 0.0
+            mdm = 0.0
+        else:
+            tr = max(h - l, abs(h - self.prev_close), abs(l - self.prev_close))
+            up = h - self.prev_high
+            dn = l - self.prev_low
+            pdm = up if (up > dn and up > 0.0) else 0.0
+            mdm = dn if (dn > up and dn > 0.0) else 0.0
+
+        # ATR (Wilder)
+        if i < self.atr_period - 1:
+            self.tr_acc += tr
+        elif i == self.atr_period - 1:
+            self.tr_acc += tr
+            self.atr = self.tr_acc / self.atr_period
+        else:
+            self.atr += (tr - self.atr) / self.atr_period
+
+        # ADX (Wilder-smoothed TR/+DM/-DM, then Wilder-smoothed DX)
+        if i < self.adx_period - 1:
+            self.trs_acc += tr
+            self.pdm_acc += pdm
+            self.mdm_acc += mdm
+        elif i == self.adx_period - 1:
+            self.trs_acc += tr
+            self.pdm_acc += pdm
+            self.mdm_acc += mdm
+            self.tr_rma = self.trs_acc / self.adx_period
+            self.plus_dm_rma = self.pdm_acc / self.adx_period
+            self.minus_dm_rma = self.mdm_acc / self.adx_period
+        else:
+            self.tr_rma += (tr - self.tr_rma) / self.adx_period
+            self.plus_dm_rma += (pdm - self.plus_dm_rma) / self.adx_period
+            self.minus_dm_rma += (mdm - self.minus_dm_rma) / self.adx_period
+        if i >= self.adx_period - 1:
+            pdi = 100.0 * self.plus_dm_rma / self.tr_rma if self.tr_rma > 0.0 else 0.0
+            mdi = 100.0 * self.minus_dm_rma / self.tr_rma if self.tr_rma > 0.0 else 0.0
+            di_sum = pdi + mdi
+            dx = abs(pdi - mdi) / di_sum * 100.0 if di_sum > 0.0 else 0.0
+            if self.dx_count < self.adx_period:
+                self.dx_acc += dx
+                self.dx_count += 1
+                if self.dx_count == self.adx_period:
+                    self.adx = self.dx_acc / self.adx_period
+            else:
+                self.adx += (dx - self.adx) / self.adx_period
+
+        # RSI (Wilder)
+        if i > 0:
+            delta = c - self.prev_close
+            gain = delta if delta > 0.0 else 0.0
+            loss = -delta if delta < 0.0 else 0.0
+            if i <= self.rsi_period:
+                self.gain_acc += gain
+                self.loss_acc += loss
+                if i == self.rsi_period:
+                    self.avg_gain = self.gain_acc / self.rsi_period
+                    self.avg_loss = self.loss_acc / self.rsi_period
+            else:
+                self.avg_gain += (gain - self.avg_gain) / self.rsi_period
+                self.avg_loss += (loss - self.avg_loss) / self.rsi_period
+            if i >= self.rsi_period:
+                rs = self.avg_gain / (self.avg_loss if self.avg_loss > 0.0 else 1e-10)
+                self.rsi = 100.0 - 100.0 / (1.0 + rs)
+
+        self.prev_close = c
+        self.prev_high = h
+        self.prev_low = l
+        self.bars_seen = i + 1
+
+    def reset(self) -> None:
+        """Forget all smoothing state (the periods are kept). Used after a
+        data gap, when folding straight across the discontinuity would
+        poison every running average."""
+        fresh = IndicatorState(self.rsi_period, self.macd_fast, self.macd_slow,
+                               self.macd_signal_period, self.atr_period, self.adx_period)
+        for f in fields(self):
+            setattr(self, f.name, getattr(fresh, f.name))
+
+    def update_from_dataframe(self, df: pd.DataFrame) -> int:
+        """
+        Fold in only the bars newer than the last one seen.
+        Returns the number of new bars applied.
+
+        If even the oldest bar of the frame is newer than the last one seen,
+        there was a gap wider than the frame (e.g. the overnight trading
+        pause): the state restarts its warm-up from this frame instead of
+        folding the discontinuity into the running averages.
+        """
+        if self.last_time is not None and not df.empty and df.index[0] > self.last_time:
+            self.reset()
+        new = df if self.last_time is None else df[df.index > self.last_time]
+        if new.empty:
+            return 0
+        opens = new["open"].to_numpy()
+        highs = new["high"].to_numpy()
+        lows = new["low"].to_numpy()
+        closes = new["close"].to_numpy()
+        for o, h, l, c in zip(opens, highs, lows, closes):
+            self.update(o, h, l, c)
+        self.last_time = new.index[-1]
+        return len(new)
+
+    def latest_values(self) -> dict:
+        """Current indicator scalars (NaN while still warming up)."""
+        return {
+            "RSI": self.rsi,
+            "MACD": self.macd,
+            "MACD_signal": self.signal_ema,
+            "histogram": self.macd - self.signal_ema,
+            "ATR": self.atr,
+            "ADX": self.adx,
+        }
+
+def trend_from_dataframe(df: pd.DataFrame, window: int = 20):
+    """
+    Classify the trend of already-fetched candles by comparing the latest
+    close against its rolling SMA. Returns "up", "down", "sideways", or
+    None when there is not enough data.
+    """
+    if df.empty or len(df) < window:
         return None
-    sma = df["close"].rolling(window=20).mean().iloc[-1]
+    sma = df["close"].rolling(window=window).mean().iloc[-1]
     current = df["close"].iloc[-1]
     if current > sma:
         return "up"
@@ -22,6 +210,12 @@ def get_higher_timeframe_trend(client, instrument, higher_tf="M15", count=50):
     else:
         return "sideways"
 
+
+def get_higher_timeframe_trend(client, instrument, higher_tf="M15", count=50):
+    from utils import fetch_ohlc_data  # reuse your existing function
+    df = fetch_ohlc_data(client, instrument, timeframe=higher_tf, count=count)
+    return trend_from_dataframe(df)
+
 # -------------------------------
 # Current Strategy (as before)
 # -------------------------------
@@ -188,21 +382,9 @@ def generate_combined_signal(data: pd.DataFrame, htf_trend: str = None) -> str:
         return generate_signal(data, htf_trend)
 
 def apply_indicators(df: pd.DataFrame, rsi_period: int, macd_fast: int, macd_slow: int, macd_signal: int, atr_period: int):
-    df["RSI"] = compute_rsi(df, rsi_period)
-    macd_line, sig_line, hist = compute_macd(df, macd_fast, macd_slow, macd_signal)
-    df["MACD"] = macd_line
-    df["MACD_signal"] = sig_line
-    df["histogram"] = hist
-    df["ATR"] = compute_atr(df, atr_period)
-
-    bb_upper, bb_mid, bb_lower = compute_bollinger_bands(df, period=20, num_std=2.0)
-    df["BB_upper"] = bb_upper
-    df["BB_mid"] = bb_mid
-    df["BB_lower"] = bb_lower
-
-    df["ADX"] = compute_adx(df, period=14)
+    # Single fused pass over the OHLC arrays computes every indicator column
+    # (including candlestick patterns) instead of one traversal per indicator.
+    return compute_all_indicators(df, rsi_period, macd_fast, macd_slow,
+                                  macd_signal, atr_period,
+                                  adx_period=14, bb_period=20, bb_num_std=2.0)
 
-    df = detect_candlestick_patterns(df)
-
-    return df
-    